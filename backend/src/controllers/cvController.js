@@ -1,10 +1,11 @@
 const pool = require("../db");
 
 /**
- * POST /api/cv/detections
- * Receives raw detection events from the CV engine and stores them.
+ * Store a single detection event and emit it via Socket.IO.
+ * Shared by the single and batched detection endpoints.
+ * Returns the inserted row id; throws with statusCode=400 on bad input.
  */
-async function postDetection(req, res) {
+async function storeDetectionEvent(app, event) {
     const {
         camera_id,
         location_id,
@@ -12,87 +13,126 @@ async function postDetection(req, res) {
         frame_number,
         detections,
         snapshot_b64,
-    } = req.body;
+    } = event;
 
     if (!camera_id || !location_id || !timestamp || !detections) {
-        return res.status(400).json({ error: "Missing required fields" });
+        const err = new Error("Missing required fields");
+        err.statusCode = 400;
+        throw err;
     }
 
-    try {
-        // Resolve internal camera UUID from camera_id string
-        const camResult = await pool.query(
-            `SELECT id AS cam_uuid, location_id AS loc_uuid
-       FROM cameras
-       WHERE camera_id = $1
-       LIMIT 1`,
-            [camera_id]
-        );
+    // Resolve internal camera UUID from camera_id string
+    const camResult = await pool.query(
+        `SELECT id AS cam_uuid, location_id AS loc_uuid
+   FROM cameras
+   WHERE camera_id = $1
+   LIMIT 1`,
+        [camera_id]
+    );
+
+    let camUuid = null;
+    // Fallback to our seeded location UUID if the CV engine passes 'loc-01' and we can't find it
+    let locUuid = "2139ff48-35b8-423f-b4cb-64ca303ef625";
+
+    if (camResult.rows.length > 0) {
+        camUuid = camResult.rows[0].cam_uuid;
+        locUuid = camResult.rows[0].loc_uuid;
+    }
 
-        let camUuid = null;
-        // Fallback to our seeded location UUID if the CV engine passes 'loc-01' and we can't find it
-        let locUuid = "2139ff48-35b8-423f-b4cb-64ca303ef625";
+    const result = await pool.query(
+        `INSERT INTO cv_detections
+    (camera_id, location_id, frame_number, detections, detection_count, snapshot_b64, timestamp)
+   VALUES ($1, $2, $3, $4, $5, $6, $7)
+   RETURNING id`,
+        [
+            camUuid,
+            locUuid,
+            frame_number || 0,
+            JSON.stringify(detections),
+            detections.length,
+            snapshot_b64 || null,
+            timestamp,
+        ]
+    );
+
+    // Update daily stats
+    const dateStr = new Date(timestamp).toISOString().split("T")[0];
+    await pool.query(
+        `INSERT INTO daily_stats (location_id, date, detection_count)
+   VALUES ($1, $2, $3)
+   ON CONFLICT (location_id, date)
+   DO UPDATE SET
+     detection_count = daily_stats.detection_count + EXCLUDED.detection_count,
+     updated_at = NOW()`,
+        [locUuid, dateStr, detections.length]
+    );
+
+    // Emit real-time detection via Socket.IO
+    const io = app.get("io");
+    if (io) {
+        console.log(`[SOCKET DEBUG] Clients connected: ${io.sockets.sockets.size} | Emitting payload for ${camera_id} to loc ${locUuid}`);
+        // console.log(`[SOCKET DEBUG] Clients connected: ${io.sockets.sockets.size}`);
+
+        try {
+            const payload = {
+                camera_id,
+                location_id: locUuid,
+                timestamp,
+                objects: detections,
+                fps: event.fps || 15.0
+            };
 
-        if (camResult.rows.length > 0) {
-            camUuid = camResult.rows[0].cam_uuid;
-            locUuid = camResult.rows[0].loc_uuid;
+            io.to(`location:${locUuid}`).emit("detection", payload);
+            io.emit("detection", payload);
+            // console.log("[SOCKET] Emitted payload for: ", camera_id);
+        } catch (err) {
+            console.error("[SOCKET FATAL ERROR] Failed to emit detection payload:", err);
         }
+    } else {
+        console.error("[SOCKET ERROR] 'io' is undefined on req.app! Socket emission failed.");
+    }
 
-        const result = await pool.query(
-            `INSERT INTO cv_detections
-        (camera_id, location_id, frame_number, detections, detection_count, snapshot_b64, timestamp)
-       VALUES ($1, $2, $3, $4, $5, $6, $7)
-       RETURNING id`,
-            [
-                camUuid,
-                locUuid,
-                frame_number || 0,
-                JSON.stringify(detections),
-                detections.length,
-                snapshot_b64 || null,
-                timestamp,
-            ]
-        );
-
-        // Update daily stats
-        const dateStr = new Date(timestamp).toISOString().split("T")[0];
-        await pool.query(
-            `INSERT INTO daily_stats (location_id, date, detection_count)
-       VALUES ($1, $2, $3)
-       ON CONFLICT (location_id, date)
-       DO UPDATE SET
-         detection_count = daily_stats.detection_count + EXCLUDED.detection_count,
-         updated_at = NOW()`,
-            [locUuid, dateStr, detections.length]
-        );
+    return result.rows[0].id;
+}
 
-        // Emit real-time detection via Socket.IO
-        const io = req.app.get("io");
-        if (io) {
-            console.log(`[SOCKET DEBUG] Clients connected: ${io.sockets.sockets.size} | Emitting payload for ${camera_id} to loc ${locUuid}`);
-            // console.log(`[SOCKET DEBUG] Clients connected: ${io.sockets.sockets.size}`);
-
-            try {
-                const payload = {
-                    camera_id,
-                    location_id: locUuid,
-                    timestamp,
-                    objects: detections,
-                    fps: req.body.fps || 15.0
-                };
-
-                io.to(`location:${locUuid}`).emit("detection", payload);
-                io.emit("detection", payload);
-                // console.log("[SOCKET] Emitted payload for: ", camera_id);
-            } catch (err) {
-                console.error("[SOCKET FATAL ERROR] Failed to emit detection payload:", err);
-            }
-        } else {
-            console.error("[SOCKET ERROR] 'io' is undefined on req.app! Socket emission failed.");
+/**
+ * POST /api/cv/detections
+ * Receives raw detection events from the CV engine and stores them.
+ */
+async function postDetection(req, res) {
+    try {
+        const id = await storeDetectionEvent(req.app, req.body);
+        return res.status(201).json({ id });
+    } catch (err) {
+        if (err.statusCode === 400) {
+            return res.status(400).json({ error: err.message });
         }
+        console.error("Error storing detection:", err);
+        return res.status(500).json({ error: "Internal server error" });
+    }
+}
+
+/**
+ * POST /api/cv/detections/batch
+ * Receives an array of detection events coalesced by the CV engine.
+ */
+async function postDetectionBatch(req, res) {
+    const events = req.body;
+    if (!Array.isArray(events)) {
+        return res.status(400).json({ error: "Expected an array of detection events" });
+    }
 
-        return res.status(201).json({ id: result.rows[0].id });
+    try {
+        const ids = [];
+        for (const event of events) {
+            ids.push(await storeDetectionEvent(req.app, event));
+        }
+        return res.status(201).json({ ids });
     } catch (err) {
-        console.error("Error storing detection:", err);
+        if (err.statusCode === 400) {
+            return res.status(400).json({ error: err.message });
+        }
+        console.error("Error storing detection batch:", err);
         return res.status(500).json({ error: "Internal server error" });
     }
 }
@@ -356,6 +396,7 @@ async function updateAlert(req, res) {
 
 module.exports = {
     postDetection,
+    postDetectionBatch,
     postAlert,
     postHeartbeat,
     getAlerts,
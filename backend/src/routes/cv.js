@@ -3,6 +3,7 @@ const apiKeyAuth = require("../middleware/apiKeyAuth");
 const authenticateToken = require("../middleware/jwtAuth");
 const {
     postDetection,
+    postDetectionBatch,
     postAlert,
     postHeartbeat,
     getAlerts,
@@ -13,6 +14,7 @@ const router = Router();
 
 // CV Engine endpoints (API key auth)
 router.post("/detections", apiKeyAuth, postDetection);
+router.post("/detections/batch", apiKeyAuth, postDetectionBatch);
 router.post("/alerts", apiKeyAuth, postAlert);
 router.post("/heartbeat", apiKeyAuth, postHeartbeat);
 
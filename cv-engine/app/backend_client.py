@@ -1,42 +1,240 @@
+import asyncio
 import logging
 import httpx
+import orjson
+from pydantic import BaseModel
+
 from app.config import Settings
-from app.models import DetectionEvent, NonScanAlert
+from app.models import NonScanAlert
 
 logger = logging.getLogger(__name__)
 
+QUEUE_MAXSIZE = 1000
+BATCH_MAX = 128  # Max detection events coalesced into one POST
+BATCH_GRACE = 0.02  # Seconds to wait for stragglers before flushing
+# Flush a batch before its serialized body can hit the backend's 10mb
+# express.json limit; events with inline snapshots run 100-500 KB each.
+BATCH_MAX_BYTES = 8 * 1024 * 1024
+
+_JSON_HEADERS = {"Content-Type": "application/json"}
+
+
+def _dump_json(payload) -> bytes:
+    """Encode a payload (plain dict or pydantic model) with orjson."""
+    if isinstance(payload, BaseModel):
+        payload = payload.model_dump()
+    return orjson.dumps(payload, option=orjson.OPT_SERIALIZE_NUMPY)
+
 
 class BackendClient:
-    """HTTP client for posting detections and alerts to the Node.js backend."""
+    """
+    HTTP client for posting detections and alerts to the Node.js backend.
+
+    Events are pushed onto a bounded queue (dropping the oldest on
+    overflow) and drained by a single background task that coalesces
+    detection events from all cameras into batched POSTs, so the per-frame
+    loops never spawn dangling tasks and HTTP round-trip cost is amortized
+    across cameras.
+    """
 
     def __init__(self, settings: Settings):
         self.base_url = settings.backend_url.rstrip("/")
         self.api_key = settings.api_key
         self._client: httpx.AsyncClient | None = None
+        self._queue: asyncio.Queue | None = None
+        self._drain_task: asyncio.Task | None = None
 
     async def start(self):
+        # Content-Type is set per request; a client-wide default would
+        # clobber the multipart boundary on the snapshot path.
         self._client = httpx.AsyncClient(
             base_url=self.base_url,
-            headers={
-                "Content-Type": "application/json",
-                "X-API-Key": self.api_key,
-            },
+            headers={"X-API-Key": self.api_key},
             timeout=httpx.Timeout(10.0, connect=5.0),
+            limits=httpx.Limits(
+                max_keepalive_connections=100,
+                max_connections=200,
+                keepalive_expiry=30,
+            ),
         )
+        self._queue = asyncio.Queue(maxsize=QUEUE_MAXSIZE)
+        self._drain_task = asyncio.create_task(self._drain())
         logger.info("Backend client started, target: %s", self.base_url)
 
     async def stop(self):
+        if self._drain_task:
+            self._drain_task.cancel()
+            try:
+                await self._drain_task
+            except asyncio.CancelledError:
+                pass
+            self._drain_task = None
         if self._client:
             await self._client.aclose()
             self._client = None
 
-    async def post_detection(self, event: DetectionEvent) -> bool:
+    # ----- Enqueue API (called from the frame loops) -----
+
+    def post_detection(self, event: dict):
+        """Queue a CV detection event (plain dict payload) for posting."""
+        self._enqueue("detection", event)
+
+    def post_detection_multipart(self, event: dict, snapshot: bytes | None):
+        """Queue a detection event with a raw JPEG snapshot part."""
+        self._enqueue("detection_multipart", (event, snapshot))
+
+    def post_alert(self, alert: NonScanAlert):
+        """Queue a non-scan alert for posting."""
+        self._enqueue("alert", alert)
+
+    def _enqueue(self, kind: str, payload):
+        try:
+            self._queue.put_nowait((kind, payload))
+            return
+        except asyncio.QueueFull:
+            pass
+        # Evict the oldest detection event rather than stalling the frame
+        # loop. Alerts are the product's actual output: one is only ever
+        # displaced by a newer alert, never by a routine frame event.
+        kept: list[tuple] = []
+        dropped: tuple | None = None
+        while dropped is None:
+            try:
+                item = self._queue.get_nowait()
+            except asyncio.QueueEmpty:
+                break
+            if item[0] == "alert":
+                kept.append(item)
+            else:
+                dropped = item
+        if dropped is None:
+            # Queue is saturated with alerts
+            if kind == "alert":
+                dropped = kept.pop(0)
+            else:
+                for item in kept:
+                    self._queue.put_nowait(item)
+                logger.warning(
+                    "Backend queue full of alerts, dropped new %s", kind
+                )
+                return
+        for item in kept:
+            self._queue.put_nowait(item)
+        self._queue.put_nowait((kind, payload))
+        logger.warning("Backend queue full, dropped oldest %s", dropped[0])
+
+    async def _drain(self):
+        while True:
+            items = [await self._queue.get()]
+            # Coalesce whatever arrives within the grace window, up to the
+            # cap, so a burst across cameras becomes one request.
+            try:
+                while len(items) < BATCH_MAX:
+                    items.append(
+                        await asyncio.wait_for(
+                            self._queue.get(), timeout=BATCH_GRACE
+                        )
+                    )
+            except asyncio.TimeoutError:
+                pass
+
+            try:
+                detections = [p for kind, p in items if kind == "detection"]
+                if len(detections) == 1:
+                    await self._send_detection(detections[0])
+                elif detections:
+                    # Split on accumulated size so one POST body stays
+                    # under the backend's JSON limit even when every
+                    # event carries a full-frame snapshot.
+                    chunk: list[dict] = []
+                    chunk_bytes = 0
+                    for event in detections:
+                        size = self._event_size(event)
+                        if chunk and chunk_bytes + size > BATCH_MAX_BYTES:
+                            await self._send_detection_batch(chunk)
+                            chunk = []
+                            chunk_bytes = 0
+                        chunk.append(event)
+                        chunk_bytes += size
+                    await self._send_detection_batch(chunk)
+                for kind, payload in items:
+                    if kind == "alert":
+                        await self._send_alert(payload)
+                    elif kind == "detection_multipart":
+                        await self._send_detection_multipart(*payload)
+            except Exception:
+                # The senders swallow httpx errors, but anything else (a
+                # serialization failure on one bad payload, say) must not
+                # kill the sole drain task and silently stop all posting.
+                logger.exception("Unexpected error draining backend queue")
+            finally:
+                for _ in items:
+                    self._queue.task_done()
+
+    @staticmethod
+    def _event_size(event: dict) -> int:
+        """
+        Cheap upper-bound on an event's serialized size. The base64
+        snapshot dominates real payloads; the constant covers every
+        other field with room to spare.
+        """
+        snapshot = event.get("snapshot_b64")
+        return (len(snapshot) if snapshot else 0) + 4096
+
+    # ----- HTTP senders (worker side) -----
+
+    async def _send_detection(self, event: dict) -> bool:
         """Post a CV detection event to the backend."""
         try:
             resp = await self._client.post(
                 "/api/cv/detections",
-                content=event.model_dump_json(),
+                content=_dump_json(event),
+                headers=_JSON_HEADERS,
+            )
+            if resp.status_code >= 400:
+                logger.warning(
+                    "Backend rejected detection: %s %s", resp.status_code, resp.text[:200]
+                )
+                return False
+            return True
+        except httpx.HTTPError as e:
+            logger.error("Failed to post detection: %s", e)
+            return False
+
+    async def _send_detection_batch(self, events: list[dict]) -> bool:
+        """Post a batch of detection events in a single request."""
+        try:
+            resp = await self._client.post(
+                "/api/cv/detections/batch",
+                content=_dump_json(events),
+                headers=_JSON_HEADERS,
             )
+            if resp.status_code >= 400:
+                logger.warning(
+                    "Backend rejected detection batch (%d events): %s %s",
+                    len(events), resp.status_code, resp.text[:200],
+                )
+                return False
+            return True
+        except httpx.HTTPError as e:
+            logger.error("Failed to post detection batch: %s", e)
+            return False
+
+    async def _send_detection_multipart(
+        self, event: dict, snapshot: bytes | None
+    ) -> bool:
+        """
+        Post a detection event with the JPEG snapshot as a raw multipart
+        part, skipping the ~33% base64 expansion. Requires the backend to
+        accept multipart on /api/cv/detections.
+        """
+        try:
+            files = {
+                "event": (None, _dump_json(event), "application/json"),
+            }
+            if snapshot is not None:
+                files["snapshot"] = ("snapshot.jpg", snapshot, "image/jpeg")
+            resp = await self._client.post("/api/cv/detections", files=files)
             if resp.status_code >= 400:
                 logger.warning(
                     "Backend rejected detection: %s %s", resp.status_code, resp.text[:200]
@@ -47,12 +245,13 @@ class BackendClient:
             logger.error("Failed to post detection: %s", e)
             return False
 
-    async def post_alert(self, alert: NonScanAlert) -> bool:
+    async def _send_alert(self, alert: NonScanAlert) -> bool:
         """Post a non-scan alert to the backend."""
         try:
             resp = await self._client.post(
                 "/api/cv/alerts",
-                content=alert.model_dump_json(),
+                content=_dump_json(alert),
+                headers=_JSON_HEADERS,
             )
             if resp.status_code >= 400:
                 logger.warning(
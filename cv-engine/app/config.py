@@ -1,8 +1,16 @@
+from functools import lru_cache
+
 from pydantic_settings import BaseSettings
 from pydantic import Field
 
 
 class Settings(BaseSettings):
+    """
+    Process-wide engine configuration, read from CV_* env vars.
+
+    Immutable for the lifetime of the process; obtain it via
+    get_settings() so the environment is only parsed once.
+    """
     # Backend connection
     backend_url: str = "http://backend:3000"
     api_key: str = ""
@@ -13,9 +21,14 @@ class Settings(BaseSettings):
     iou_threshold: float = 0.5
     device: str = "cpu"  # "cpu", "cuda:0", etc.
     img_size: int = 640
+    use_onnx: bool = False  # Export .pt to ONNX once and run via ONNX Runtime
+    half: bool = False  # FP16 inference (CUDA tensor cores / FP16 ONNX export)
+    inference_batch_size: int = 8  # Max frames fused into one predict call
+    inference_batch_wait_ms: float = 10.0  # How long a frame may wait for batch mates
 
     # Stream processing
     frame_skip: int = 3  # Process every Nth frame
+    snapshot_multipart: bool = False  # Send snapshots as raw multipart JPEG (backend must support it)
     reconnect_delay: int = 5  # Seconds before reconnecting to dropped stream
     max_reconnect_attempts: int = 50
 
@@ -34,4 +47,10 @@ class Settings(BaseSettings):
     # Logging
     log_level: str = "INFO"
 
-    model_config = {"env_prefix": "CV_"}
+    model_config = {"env_prefix": "CV_", "frozen": True}
+
+
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """Return the shared Settings singleton (env is parsed exactly once)."""
+    return Settings()
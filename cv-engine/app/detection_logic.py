@@ -1,6 +1,8 @@
 import logging
 import time
+import cv2
 import numpy as np
+from collections import deque
 from dataclasses import dataclass, field
 
 from app.tracker import TrackState
@@ -8,8 +10,12 @@ from app.config import Settings
 
 logger = logging.getLogger(__name__)
 
+# Bit flags in the rasterized zone mask
+_SCAN_BIT = 1
+_EXIT_BIT = 2
 
-@dataclass
+
+@dataclass(slots=True)
 class TrackedItem:
     track_id: int
     class_name: str
@@ -21,7 +27,9 @@ class TrackedItem:
     total_frames: int = 0
     alerted: bool = False
     last_alert_time: float = 0.0
-    last_bbox: list[float] = field(default_factory=list)
+    # Preallocated 4-float buffer, updated in place via np.copyto so the
+    # instance can be recycled through the free-list without aliasing.
+    last_bbox: np.ndarray = field(default_factory=lambda: np.zeros(4, dtype=np.float32))
     last_confidence: float = 0.0
 
 
@@ -42,12 +50,25 @@ class NonScanDetector:
         self.min_track_length = settings.min_track_length
         self.cooldown_seconds = settings.cooldown_seconds
         self.tracked_items: dict[int, TrackedItem] = {}
+        # Cached polygon edge arrays per zone slot, invalidated when the
+        # zone list object changes (update_zones always assigns a new list).
+        self._edge_cache: dict[str, tuple] = {}
+        # Rasterized zone bitmask: (scan_ref, exit_ref, shape, mask)
+        self._mask_cache: tuple | None = None
+        # (last_seen, track_id) in monotone order; a track may appear many
+        # times, stale entries are skipped during expiry.
+        self._expiry: deque[tuple[float, int]] = deque()
+        # Evicted TrackedItem instances, recycled on new-track creation so
+        # high track churn doesn't hammer the allocator.
+        self._free: list[TrackedItem] = []
 
     def update(
         self,
         tracks: list[TrackState],
         scan_zone: list[list[int]] | None = None,
         exit_zone: list[list[int]] | None = None,
+        now: float | None = None,
+        frame_shape: tuple[int, int] | None = None,
     ) -> list[TrackedItem]:
         """
         Process current tracks and return items that should trigger alerts.
@@ -56,35 +77,66 @@ class NonScanDetector:
             tracks: Active tracks from the tracker.
             scan_zone: Polygon defining the scanning area (optional).
             exit_zone: Polygon defining the exit area (optional).
+            now: Current epoch time; pass the caller's clock read to avoid
+                a second time.time() per frame.
+            frame_shape: (height, width) of the frame. When given, zone
+                membership is a single lookup in a rasterized mask instead
+                of a ray-cast.
 
         Returns:
             List of TrackedItem that should trigger non-scan alerts.
         """
-        now = time.time()
-        current_track_ids = set()
+        if now is None:
+            now = time.time()
         alerts = []
 
-        for track in tracks:
-            current_track_ids.add(track.track_id)
-            bbox_center = self._bbox_center(track.bbox)
+        if tracks:
+            centers = np.empty((len(tracks), 2), dtype=np.float32)
+            for i, track in enumerate(tracks):
+                b = track.bbox
+                centers[i, 0] = (b[0] + b[2]) / 2
+                centers[i, 1] = (b[1] + b[3]) / 2
+            if frame_shape is not None and (scan_zone or exit_zone):
+                h, w = frame_shape
+                xs = np.clip(centers[:, 0].astype(np.int32), 0, w - 1)
+                ys = np.clip(centers[:, 1].astype(np.int32), 0, h - 1)
+                flags = self._zone_mask(scan_zone, exit_zone, frame_shape)[ys, xs]
+                in_scan_arr = (
+                    np.ones(len(tracks), dtype=bool) if not scan_zone
+                    else (flags & _SCAN_BIT) != 0
+                )
+                in_exit_arr = (
+                    np.zeros(len(tracks), dtype=bool) if not exit_zone
+                    else (flags & _EXIT_BIT) != 0
+                )
+            else:
+                in_scan_arr = self._zone_membership(centers, scan_zone, "scan", default=True)
+                in_exit_arr = self._zone_membership(centers, exit_zone, "exit", default=False)
 
+        for i, track in enumerate(tracks):
             if track.track_id not in self.tracked_items:
-                self.tracked_items[track.track_id] = TrackedItem(
-                    track_id=track.track_id,
-                    class_name=track.class_name,
-                    class_id=track.class_id,
-                    first_seen=now,
-                    last_seen=now,
-                )
+                if self._free:
+                    item = self._free.pop()
+                    self._reset_item(item, track, now)
+                else:
+                    item = TrackedItem(
+                        track_id=track.track_id,
+                        class_name=track.class_name,
+                        class_id=track.class_id,
+                        first_seen=now,
+                        last_seen=now,
+                    )
+                self.tracked_items[track.track_id] = item
 
             item = self.tracked_items[track.track_id]
             item.last_seen = now
+            self._expiry.append((now, track.track_id))
             item.total_frames += 1
-            item.last_bbox = track.bbox.tolist()
+            np.copyto(item.last_bbox, track.bbox)
             item.last_confidence = track.confidence
 
-            in_scan = self._point_in_polygon(bbox_center, scan_zone) if scan_zone else True
-            in_exit = self._point_in_polygon(bbox_center, exit_zone) if exit_zone else False
+            in_scan = bool(in_scan_arr[i])
+            in_exit = bool(in_exit_arr[i])
 
             if in_scan:
                 item.frames_in_scan_zone += 1
@@ -104,41 +156,103 @@ class NonScanDetector:
                     item.last_alert_time = now
                     alerts.append(item)
 
-        # Clean up stale tracks (not seen for 60 seconds)
-        stale_ids = [
-            tid for tid, item in self.tracked_items.items()
-            if tid not in current_track_ids and now - item.last_seen > 60
-        ]
-        for tid in stale_ids:
-            del self.tracked_items[tid]
+        # Clean up stale tracks (not seen for 60 seconds). The expiry deque
+        # is ordered by last_seen, so this pops O(1) amortized per frame
+        # instead of scanning every tracked item.
+        while self._expiry and now - self._expiry[0][0] > 60:
+            _, tid = self._expiry.popleft()
+            item = self.tracked_items.get(tid)
+            if item is not None and now - item.last_seen > 60:
+                del self.tracked_items[tid]
+                self._free.append(item)
 
         return alerts
 
     @staticmethod
-    def _bbox_center(bbox: np.ndarray) -> tuple[float, float]:
-        return (float(bbox[0] + bbox[2]) / 2, float(bbox[1] + bbox[3]) / 2)
+    def _reset_item(item: TrackedItem, track: TrackState, now: float):
+        """Reinitialize a recycled TrackedItem for a new track."""
+        item.track_id = track.track_id
+        item.class_name = track.class_name
+        item.class_id = track.class_id
+        item.first_seen = now
+        item.last_seen = now
+        item.frames_in_scan_zone = 0
+        item.frames_outside_scan_zone = 0
+        item.total_frames = 0
+        item.alerted = False
+        item.last_alert_time = 0.0
+        item.last_confidence = 0.0
+
+    def _zone_mask(
+        self,
+        scan_zone: list[list[int]] | None,
+        exit_zone: list[list[int]] | None,
+        shape: tuple[int, int],
+    ) -> np.ndarray:
+        """
+        Rasterize both zones once into a uint8 bitmask at frame resolution
+        (OpenCV's SIMD fillPoly), making per-center membership a single
+        indexed load. Rebuilt only when a zone or the frame size changes.
+        """
+        cached = self._mask_cache
+        if (
+            cached is None
+            or cached[0] is not scan_zone
+            or cached[1] is not exit_zone
+            or cached[2] != shape
+        ):
+            mask = np.zeros(shape, dtype=np.uint8)
+            if scan_zone and len(scan_zone) >= 3:
+                cv2.fillPoly(
+                    mask, [np.asarray(scan_zone, dtype=np.int32)], _SCAN_BIT
+                )
+            if exit_zone and len(exit_zone) >= 3:
+                exit_mask = np.zeros(shape, dtype=np.uint8)
+                cv2.fillPoly(
+                    exit_mask, [np.asarray(exit_zone, dtype=np.int32)], _EXIT_BIT
+                )
+                mask |= exit_mask
+            self._mask_cache = (scan_zone, exit_zone, shape, mask)
+        return self._mask_cache[3]
+
+    def _zone_membership(
+        self,
+        centers: np.ndarray,
+        zone: list[list[int]] | None,
+        slot: str,
+        default: bool,
+    ) -> np.ndarray:
+        """Test all centers against a zone polygon in one vectorized pass."""
+        if not zone:
+            return np.full(len(centers), default, dtype=bool)
+        if len(zone) < 3:
+            return np.zeros(len(centers), dtype=bool)
+        return self._points_in_polygon(centers, self._zone_edges(zone, slot))
+
+    def _zone_edges(self, zone: list[list[int]], slot: str) -> tuple:
+        """Return cached (xi, yi, xj, yj) edge arrays for a zone polygon."""
+        cached = self._edge_cache.get(slot)
+        if cached is None or cached[0] is not zone:
+            poly = np.asarray(zone, dtype=np.float32)
+            xi, yi = poly.T
+            xj, yj = np.roll(poly, 1, axis=0).T
+            cached = (zone, (xi, yi, xj, yj))
+            self._edge_cache[slot] = cached
+        return cached[1]
 
     @staticmethod
-    def _point_in_polygon(
-        point: tuple[float, float], polygon: list[list[int]] | None
-    ) -> bool:
-        """Ray-casting algorithm for point-in-polygon test."""
-        if not polygon or len(polygon) < 3:
-            return False
-
-        x, y = point
-        n = len(polygon)
-        inside = False
-
-        j = n - 1
-        for i in range(n):
-            xi, yi = polygon[i]
-            xj, yj = polygon[j]
-            if ((yi > y) != (yj > y)) and (x < (xj - xi) * (y - yi) / (yj - yi) + xi):
-                inside = not inside
-            j = i
-
-        return inside
+    def _points_in_polygon(centers: np.ndarray, edges: tuple) -> np.ndarray:
+        """Vectorized ray-casting: which centers fall inside the polygon."""
+        xi, yi, xj, yj = edges
+        x = centers[:, 0:1]
+        y = centers[:, 1:2]
+        cond1 = (yi > y) != (yj > y)
+        # Horizontal edges divide by zero; cond1 masks them out below.
+        with np.errstate(divide="ignore", invalid="ignore"):
+            cond2 = x < (xj - xi) * (y - yi) / (yj - yi) + xi
+        return np.bitwise_xor.reduce(cond1 & cond2, axis=1)
 
     def reset(self):
+        self._free.extend(self.tracked_items.values())
         self.tracked_items.clear()
+        self._expiry.clear()
@@ -0,0 +1,86 @@
+import asyncio
+import logging
+
+import numpy as np
+
+from app.config import Settings
+from app.detector import YOLODetector
+from app.models import DetectionBatch
+
+logger = logging.getLogger(__name__)
+
+
+class InferenceScheduler:
+    """
+    Micro-batches detect() calls from all cameras into single predict calls.
+
+    Each StreamProcessor awaits submit(); a background task collects the
+    frames that arrive within a short window and runs them through the
+    model as one batch. Per-call overhead (kernel launches, pre/post
+    processing setup) is amortized across cameras, which is where most of
+    the single-frame GPU underutilization comes from.
+    """
+
+    def __init__(self, detector: YOLODetector, settings: Settings):
+        self.detector = detector
+        self.max_batch = settings.inference_batch_size
+        self.max_wait = settings.inference_batch_wait_ms / 1000.0
+        self._pending: list[tuple[np.ndarray, asyncio.Future]] = []
+        self._wakeup = asyncio.Event()
+        self._task: asyncio.Task | None = None
+
+    async def start(self):
+        self._task = asyncio.create_task(self._loop())
+        logger.info(
+            "Inference scheduler started (max_batch=%d, max_wait=%.0fms)",
+            self.max_batch, self.max_wait * 1000,
+        )
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        for _, fut in self._pending:
+            if not fut.done():
+                fut.cancel()
+        self._pending.clear()
+
+    async def submit(self, frame: np.ndarray) -> DetectionBatch:
+        """Queue a frame for inference and await its DetectionBatch."""
+        fut = asyncio.get_running_loop().create_future()
+        self._pending.append((frame, fut))
+        self._wakeup.set()
+        return await fut
+
+    async def _loop(self):
+        while True:
+            await self._wakeup.wait()
+            # Short grace window so frames from other cameras can join
+            if self.max_wait > 0 and len(self._pending) < self.max_batch:
+                await asyncio.sleep(self.max_wait)
+
+            batch = self._pending[:self.max_batch]
+            del self._pending[:self.max_batch]
+            if not self._pending:
+                self._wakeup.clear()
+            if not batch:
+                continue
+
+            frames = [f for f, _ in batch]
+            try:
+                results = await asyncio.to_thread(
+                    self.detector.detect_batch, frames
+                )
+            except Exception as e:
+                logger.error("Batched inference failed: %s", e)
+                for _, fut in batch:
+                    if not fut.done():
+                        fut.set_exception(e)
+            else:
+                for (_, fut), dets in zip(batch, results):
+                    if not fut.done():
+                        fut.set_result(dets)
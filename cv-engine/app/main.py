@@ -6,13 +6,14 @@ from contextlib import asynccontextmanager
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 
-from app.config import Settings
+from app.config import get_settings
 from app.detector import YOLODetector
+from app.inference_scheduler import InferenceScheduler
 from app.backend_client import BackendClient
-from app.stream_processor import StreamProcessor
-from app.models import CameraConfig, CameraInfo, CameraStatus, HealthResponse
+from app.stream_processor import StreamProcessor, active_stream_count
+from app.models import CameraConfig, CameraInfo, HealthResponse
 
-settings = Settings()
+settings = get_settings()
 
 logging.basicConfig(
     level=getattr(logging, settings.log_level.upper(), logging.INFO),
@@ -22,6 +23,7 @@ logger = logging.getLogger(__name__)
 
 # Global state
 detector = YOLODetector(settings)
+scheduler = InferenceScheduler(detector, settings)
 backend = BackendClient(settings)
 processors: dict[str, StreamProcessor] = {}
 start_time = time.time()
@@ -32,6 +34,7 @@ async def lifespan(app: FastAPI):
     # Startup
     logger.info("ScanGuard CV Engine starting up...")
     detector.load()
+    await scheduler.start()
     await backend.start()
 
     # Start heartbeat loop
@@ -43,6 +46,7 @@ async def lifespan(app: FastAPI):
     heartbeat_task.cancel()
     for proc in processors.values():
         await proc.stop()
+    await scheduler.stop()
     await backend.stop()
     logger.info("CV Engine shut down.")
 
@@ -69,13 +73,10 @@ async def root():
 
 @app.get("/health", response_model=HealthResponse)
 async def health():
-    active = sum(
-        1 for p in processors.values() if p.status == CameraStatus.RUNNING
-    )
     return HealthResponse(
         status="ok" if detector.is_loaded else "degraded",
         cameras=len(processors),
-        active_streams=active,
+        active_streams=active_stream_count(),
         model_loaded=detector.is_loaded,
         uptime_seconds=round(time.time() - start_time, 1),
     )
@@ -101,7 +102,7 @@ async def add_camera(config: CameraConfig):
     if config.camera_id in processors:
         raise HTTPException(409, f"Camera {config.camera_id} already exists")
 
-    proc = StreamProcessor(config, detector, backend, settings)
+    proc = StreamProcessor(config, scheduler, backend, settings)
     processors[config.camera_id] = proc
     await proc.start()
     logger.info("Camera added: %s -> %s", config.camera_id, config.rtsp_url)
@@ -151,7 +152,7 @@ async def add_cameras_bulk(configs: list[CameraConfig]):
     for config in configs:
         if config.camera_id in processors:
             continue
-        proc = StreamProcessor(config, detector, backend, settings)
+        proc = StreamProcessor(config, scheduler, backend, settings)
         processors[config.camera_id] = proc
         await proc.start()
         results.append(proc.get_info())
@@ -181,9 +182,7 @@ async def _heartbeat_loop():
             await asyncio.sleep(30)
             payload = {
                 "cameras": len(processors),
-                "active": sum(
-                    1 for p in processors.values() if p.status == CameraStatus.RUNNING
-                ),
+                "active": active_stream_count(),
                 "uptime": round(time.time() - start_time, 1),
             }
             await backend.heartbeat(payload)
@@ -1,7 +1,10 @@
 from pydantic import BaseModel
+from dataclasses import dataclass
 from datetime import datetime
 from enum import Enum
 
+import numpy as np
+
 
 class CameraStatus(str, Enum):
     RUNNING = "running"
@@ -10,6 +13,34 @@ class CameraStatus(str, Enum):
     CONNECTING = "connecting"
 
 
+@dataclass
+class DetectionBatch:
+    """
+    Structure-of-arrays container for one frame's detections.
+
+    Used on the hot detector -> tracker path where pydantic validation
+    and per-detection dicts are pure overhead; pydantic models are only
+    built from this at the serialization boundary.
+    """
+
+    bboxes: np.ndarray  # (N, 4) float32 [x1, y1, x2, y2]
+    confidences: np.ndarray  # (N,) float32
+    class_ids: np.ndarray  # (N,) int32
+    class_names: list[str]
+
+    def __len__(self) -> int:
+        return self.bboxes.shape[0]
+
+    @classmethod
+    def empty(cls) -> "DetectionBatch":
+        return cls(
+            bboxes=np.empty((0, 4), dtype=np.float32),
+            confidences=np.empty(0, dtype=np.float32),
+            class_ids=np.empty(0, dtype=np.int32),
+            class_names=[],
+        )
+
+
 class BoundingBox(BaseModel):
     x1: float
     y1: float
@@ -28,7 +59,9 @@ class Detection(BaseModel):
 class DetectionEvent(BaseModel):
     camera_id: str
     location_id: str
-    timestamp: str
+    # datetime serializes to ISO 8601 natively in pydantic-core (Rust),
+    # which is cheaper than formatting the string in Python per frame.
+    timestamp: datetime
     frame_number: int
     detections: list[Detection]
     snapshot_b64: str | None = None
@@ -37,7 +70,7 @@ class DetectionEvent(BaseModel):
 class NonScanAlert(BaseModel):
     camera_id: str
     location_id: str
-    timestamp: str
+    timestamp: datetime
     track_id: int
     class_name: str
     confidence: float
@@ -61,7 +94,8 @@ class CameraInfo(BaseModel):
     fps: float = 0.0
     frame_count: int = 0
     detection_count: int = 0
-    last_detection: str | None = None
+    last_detection: datetime | None = None
+    frame_skip: int = 0  # Current (possibly adaptive) skip interval
 
 
 class HealthResponse(BaseModel):
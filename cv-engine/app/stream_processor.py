@@ -1,14 +1,22 @@
 import asyncio
 import base64
 import logging
+import queue
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
 
 import cv2
 import numpy as np
 
+try:
+    from turbojpeg import TurboJPEG  # optional, SIMD JPEG via libjpeg-turbo
+except ImportError:
+    TurboJPEG = None
+
 from app.config import Settings
-from app.detector import YOLODetector
+from app.inference_scheduler import InferenceScheduler
 from app.tracker import SimpleTracker
 from app.detection_logic import NonScanDetector
 from app.backend_client import BackendClient
@@ -17,13 +25,25 @@ from app.models import (
     CameraConfig,
     CameraInfo,
     CameraStatus,
-    Detection,
-    DetectionEvent,
+    DetectionBatch,
     NonScanAlert,
 )
 
 logger = logging.getLogger(__name__)
 
+# Small on purpose: we always want the freshest frame, not a backlog.
+FRAME_QUEUE_SIZE = 2
+
+# Count of processors currently in RUNNING state, maintained on status
+# transitions so /health and the heartbeat never scan every processor.
+# Mutated only from the event loop, so no lock is needed.
+_active_streams = 0
+
+
+def active_stream_count() -> int:
+    """Number of streams currently in the RUNNING state."""
+    return _active_streams
+
 
 class StreamProcessor:
     """Processes a single RTSP camera stream: read frames, detect, track, alert."""
@@ -31,12 +51,12 @@ class StreamProcessor:
     def __init__(
         self,
         config: CameraConfig,
-        detector: YOLODetector,
+        scheduler: InferenceScheduler,
         backend: BackendClient,
         settings: Settings,
     ):
         self.config = config
-        self.detector = detector
+        self.scheduler = scheduler
         self.backend = backend
         self.settings = settings
 
@@ -51,10 +71,27 @@ class StreamProcessor:
         self.status = CameraStatus.STOPPED
         self.frame_count = 0
         self.detection_count = 0
-        self.last_detection_time: str | None = None
+        self.last_detection_time: datetime | None = None
         self._fps = 0.0
         self._task: asyncio.Task | None = None
         self._stop_event = asyncio.Event()
+        self._tj = None  # lazily constructed TurboJPEG encoder
+        # Adaptive skip: raised above the configured floor when inference
+        # cannot keep up with the target frame rate. Read by the decoder
+        # thread; plain int store is atomic under the GIL.
+        self._frame_skip = settings.frame_skip
+        self._ema_infer_ms = 0.0
+
+    def _set_status(self, status: CameraStatus):
+        """Update status, keeping the module-level running counter in sync."""
+        global _active_streams
+        if status == self.status:
+            return
+        if self.status == CameraStatus.RUNNING:
+            _active_streams -= 1
+        if status == CameraStatus.RUNNING:
+            _active_streams += 1
+        self.status = status
 
     async def start(self):
         if self._task and not self._task.done():
@@ -73,7 +110,7 @@ class StreamProcessor:
             except asyncio.CancelledError:
                 pass
             self._task = None
-        self.status = CameraStatus.STOPPED
+        self._set_status(CameraStatus.STOPPED)
         logger.info("Stopped stream processor for camera %s", self.config.camera_id)
 
     def get_info(self) -> CameraInfo:
@@ -85,6 +122,7 @@ class StreamProcessor:
             frame_count=self.frame_count,
             detection_count=self.detection_count,
             last_detection=self.last_detection_time,
+            frame_skip=self._frame_skip,
         )
 
     async def _run(self):
@@ -92,7 +130,7 @@ class StreamProcessor:
         while not self._stop_event.is_set() and attempt < self.settings.max_reconnect_attempts:
             cap = None
             try:
-                self.status = CameraStatus.CONNECTING
+                self._set_status(CameraStatus.CONNECTING)
                 logger.info(
                     "Connecting to RTSP stream: %s (attempt %d)",
                     self.config.rtsp_url, attempt + 1,
@@ -103,7 +141,7 @@ class StreamProcessor:
                 if not cap.isOpened():
                     raise ConnectionError(f"Cannot open RTSP stream: {self.config.rtsp_url}")
 
-                self.status = CameraStatus.RUNNING
+                self._set_status(CameraStatus.RUNNING)
                 attempt = 0  # Reset on successful connection
                 logger.info("Connected to camera %s", self.config.camera_id)
 
@@ -112,7 +150,7 @@ class StreamProcessor:
             except asyncio.CancelledError:
                 break
             except Exception as e:
-                self.status = CameraStatus.ERROR
+                self._set_status(CameraStatus.ERROR)
                 attempt += 1
                 logger.error(
                     "Stream error for camera %s: %s. Reconnecting in %ds (attempt %d/%d)",
@@ -128,130 +166,231 @@ class StreamProcessor:
             logger.error(
                 "Max reconnect attempts reached for camera %s", self.config.camera_id
             )
-            self.status = CameraStatus.ERROR
+            self._set_status(CameraStatus.ERROR)
 
-    async def _process_stream(self, cap: cv2.VideoCapture):
+    def _decode_loop(
+        self,
+        cap: cv2.VideoCapture,
+        frames: queue.Queue,
+        stop: threading.Event,
+    ):
+        """
+        Dedicated decoder thread for one camera.
+
+        cap.grab() pulls a frame off the demuxer without the full decode,
+        so skipped frames stay cheap while the stream position keeps up
+        with real time. Fully decoded frames go into a small queue that
+        drops the oldest entry on overflow, so the processing loop always
+        sees the freshest frame. A None sentinel signals connection loss.
+        """
         frame_idx = 0
-        fps_start = time.monotonic()
-        fps_frame_count = 0
-
-        while not self._stop_event.is_set():
-            ret, frame = await asyncio.to_thread(cap.read)
-            if not ret:
-                raise ConnectionError("Lost connection to RTSP stream")
-
+        while not stop.is_set():
+            if not cap.grab():
+                frames.put(None)
+                return
             frame_idx += 1
-
-            # Skip frames for performance
-            if frame_idx % self.settings.frame_skip != 0:
+            if frame_idx % self._frame_skip != 0:
                 continue
-
-            self.frame_count += 1
-            fps_frame_count += 1
-
-            # Calculate FPS every second
-            elapsed = time.monotonic() - fps_start
-            if elapsed >= 1.0:
-                self._fps = round(fps_frame_count / elapsed, 1)
-                fps_frame_count = 0
-                fps_start = time.monotonic()
-
-            # Run detection in thread pool (blocks during inference)
-            detections = await asyncio.to_thread(self.detector.detect, frame)
-
-            if not detections:
-                # Still update tracker with empty to age out tracks
-                self.tracker.update([])
+            ok, frame = cap.retrieve()
+            if not ok:
                 continue
+            try:
+                frames.put_nowait(frame)
+            except queue.Full:
+                try:
+                    frames.get_nowait()
+                except queue.Empty:
+                    pass
+                frames.put_nowait(frame)
 
-            self.detection_count += len(detections)
-            now_iso = datetime.now(timezone.utc).isoformat()
-            self.last_detection_time = now_iso
-
-            # Update tracker
-            tracks = self.tracker.update(detections)
-
-            # Build detection event
-            det_models = []
-            for det in detections:
-                # Find matching track
-                track_id = None
-                for t in tracks:
-                    if self._iou_single(det["bbox"], t.bbox.tolist()) > 0.5:
-                        track_id = t.track_id
-                        break
-                det_models.append(Detection(
-                    class_id=det["class_id"],
-                    class_name=det["class_name"],
-                    confidence=det["confidence"],
-                    bbox=BoundingBox(
-                        x1=det["bbox"][0], y1=det["bbox"][1],
-                        x2=det["bbox"][2], y2=det["bbox"][3],
-                    ),
-                    track_id=track_id,
-                ))
-
-            # Encode snapshot
-            snapshot_b64 = await self._encode_snapshot(frame)
-
-            event = DetectionEvent(
-                camera_id=self.config.camera_id,
-                location_id=self.config.location_id,
-                timestamp=now_iso,
-                frame_number=self.frame_count,
-                detections=det_models,
-                snapshot_b64=snapshot_b64,
-            )
+    async def _process_stream(self, cap: cv2.VideoCapture):
+        fps_start = time.monotonic()
+        fps_frame_count = 0
 
-            # Post to backend (fire and forget)
-            asyncio.create_task(self.backend.post_detection(event))
+        frames: queue.Queue = queue.Queue(maxsize=FRAME_QUEUE_SIZE)
+        decoder_stop = threading.Event()
+        decoder = threading.Thread(
+            target=self._decode_loop,
+            args=(cap, frames, decoder_stop),
+            name=f"decode-{self.config.camera_id}",
+            daemon=True,
+        )
+        decoder.start()
+        # Dedicated single-thread executor so frame waits never contend
+        # with other cameras in the default asyncio pool.
+        executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix=f"frames-{self.config.camera_id}"
+        )
+        loop = asyncio.get_running_loop()
 
-            # Check for non-scan events
-            alerts = self.non_scan_detector.update(
-                tracks,
-                scan_zone=self.config.scan_zone,
-                exit_zone=self.config.exit_zone,
-            )
+        try:
+            while not self._stop_event.is_set():
+                try:
+                    frame = await loop.run_in_executor(
+                        executor, frames.get, True, 1.0
+                    )
+                except queue.Empty:
+                    continue
+                if frame is None:
+                    raise ConnectionError("Lost connection to RTSP stream")
+
+                self.frame_count += 1
+                fps_frame_count += 1
+
+                # Calculate FPS every second
+                elapsed = time.monotonic() - fps_start
+                if elapsed >= 1.0:
+                    self._fps = round(fps_frame_count / elapsed, 1)
+                    fps_frame_count = 0
+                    fps_start = time.monotonic()
+
+                # Detection runs on the shared micro-batching scheduler
+                infer_start = time.monotonic()
+                detections = await self.scheduler.submit(frame)
+                self._update_frame_skip(
+                    (time.monotonic() - infer_start) * 1000.0
+                )
 
-            for alert_item in alerts:
-                alert = NonScanAlert(
-                    camera_id=self.config.camera_id,
-                    location_id=self.config.location_id,
-                    timestamp=now_iso,
-                    track_id=alert_item.track_id,
-                    class_name=alert_item.class_name,
-                    confidence=alert_item.last_confidence,
-                    bbox=BoundingBox(
-                        x1=alert_item.last_bbox[0], y1=alert_item.last_bbox[1],
-                        x2=alert_item.last_bbox[2], y2=alert_item.last_bbox[3],
-                    ),
-                    snapshot_b64=snapshot_b64,
-                    description=f"Tracked item '{alert_item.class_name}' (track {alert_item.track_id}) "
-                                f"exited scan zone without POS event after {alert_item.total_frames} frames.",
+                if len(detections) == 0:
+                    # Still update tracker with empty to age out tracks
+                    self.tracker.update(DetectionBatch.empty())
+                    continue
+
+                # One clock read per frame, shared with the non-scan detector
+                self.detection_count += len(detections)
+                now = time.time()
+                now_dt = datetime.fromtimestamp(now, timezone.utc)
+                self.last_detection_time = now_dt
+
+                # Update tracker
+                tracks = self.tracker.update(detections)
+
+                # Assign track ids to detections in one vectorized IoU pass
+                track_ids: list[int | None] = [None] * len(detections)
+                if tracks:
+                    trk_boxes = np.stack([t.bbox for t in tracks]).astype(np.float32)
+                    iou = self._iou_matrix(detections.bboxes, trk_boxes)
+                    best = iou.argmax(axis=1)
+                    best_iou = iou[np.arange(len(detections)), best]
+                    for i in np.flatnonzero(best_iou > 0.5):
+                        track_ids[i] = tracks[int(best[i])].track_id
+
+                # Build the backend payload as plain dicts; pydantic
+                # validation buys nothing for data we just produced.
+                bboxes = detections.bboxes
+                cls_ids = detections.class_ids
+                confs = detections.confidences
+                names = detections.class_names
+                det_dicts = [
+                    {
+                        "class_id": int(cls_ids[i]),
+                        "class_name": names[i],
+                        "confidence": float(confs[i]),
+                        "bbox": {
+                            "x1": float(bboxes[i, 0]), "y1": float(bboxes[i, 1]),
+                            "x2": float(bboxes[i, 2]), "y2": float(bboxes[i, 3]),
+                        },
+                        "track_id": track_ids[i],
+                    }
+                    for i in range(len(detections))
+                ]
+
+                # Encode snapshot (raw JPEG; base64 only when the backend needs it)
+                snapshot = await self._encode_snapshot(frame)
+                snapshot_b64: str | None = None
+                if snapshot is not None and not self.settings.snapshot_multipart:
+                    snapshot_b64 = base64.b64encode(snapshot).decode("ascii")
+
+                event = {
+                    "camera_id": self.config.camera_id,
+                    "location_id": self.config.location_id,
+                    "timestamp": now_dt,
+                    "frame_number": self.frame_count,
+                    "detections": det_dicts,
+                    "snapshot_b64": snapshot_b64,
+                }
+
+                # Hand off to the backend client's bounded queue
+                if self.settings.snapshot_multipart:
+                    self.backend.post_detection_multipart(event, snapshot)
+                else:
+                    self.backend.post_detection(event)
+
+                # Check for non-scan events
+                alerts = self.non_scan_detector.update(
+                    tracks,
+                    scan_zone=self.config.scan_zone,
+                    exit_zone=self.config.exit_zone,
+                    now=now,
+                    frame_shape=frame.shape[:2],
                 )
-                asyncio.create_task(self.backend.post_alert(alert))
 
-            # Yield control to event loop
-            await asyncio.sleep(0)
+                # Alerts are rare; only then pay for base64 in multipart mode
+                if alerts and snapshot_b64 is None and snapshot is not None:
+                    snapshot_b64 = base64.b64encode(snapshot).decode("ascii")
+
+                for alert_item in alerts:
+                    alert = NonScanAlert(
+                        camera_id=self.config.camera_id,
+                        location_id=self.config.location_id,
+                        timestamp=now_dt,
+                        track_id=alert_item.track_id,
+                        class_name=alert_item.class_name,
+                        confidence=alert_item.last_confidence,
+                        bbox=BoundingBox(
+                            x1=float(alert_item.last_bbox[0]),
+                            y1=float(alert_item.last_bbox[1]),
+                            x2=float(alert_item.last_bbox[2]),
+                            y2=float(alert_item.last_bbox[3]),
+                        ),
+                        snapshot_b64=snapshot_b64,
+                        description=f"Tracked item '{alert_item.class_name}' (track {alert_item.track_id}) "
+                                    f"exited scan zone without POS event after {alert_item.total_frames} frames.",
+                    )
+                    self.backend.post_alert(alert)
+
+                # Yield control to event loop
+                await asyncio.sleep(0)
+        finally:
+            decoder_stop.set()
+            executor.shutdown(wait=False)
+            decoder.join(timeout=2.0)
+
+    def _update_frame_skip(self, infer_ms: float):
+        """Widen the frame skip when inference falls behind the stream."""
+        if self._ema_infer_ms == 0.0:
+            self._ema_infer_ms = infer_ms
+        else:
+            self._ema_infer_ms = 0.9 * self._ema_infer_ms + 0.1 * infer_ms
+        frame_budget_ms = 1000.0 / self.settings.frame_rate
+        self._frame_skip = max(
+            self.settings.frame_skip, int(self._ema_infer_ms / frame_budget_ms)
+        )
 
-    async def _encode_snapshot(self, frame: np.ndarray) -> str | None:
-        """JPEG-encode frame and return base64 string."""
+    async def _encode_snapshot(self, frame: np.ndarray) -> bytes | None:
+        """JPEG-encode frame and return raw bytes."""
         try:
-            _, buffer = await asyncio.to_thread(
-                cv2.imencode, ".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, 70]
-            )
-            return base64.b64encode(buffer).decode("ascii")
+            return await asyncio.to_thread(self._encode_jpeg, frame)
         except Exception:
             return None
 
+    def _encode_jpeg(self, frame: np.ndarray) -> bytes:
+        """Encode via libjpeg-turbo when installed, else OpenCV/libjpeg."""
+        if TurboJPEG is not None:
+            if self._tj is None:
+                self._tj = TurboJPEG()
+            return self._tj.encode(frame, quality=70)
+        _, buffer = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, 70])
+        return buffer.tobytes()
+
     @staticmethod
-    def _iou_single(box_a: list[float], box_b: list[float]) -> float:
-        x1 = max(box_a[0], box_b[0])
-        y1 = max(box_a[1], box_b[1])
-        x2 = min(box_a[2], box_b[2])
-        y2 = min(box_a[3], box_b[3])
-        inter = max(0, x2 - x1) * max(0, y2 - y1)
-        area_a = (box_a[2] - box_a[0]) * (box_a[3] - box_a[1])
-        area_b = (box_b[2] - box_b[0]) * (box_b[3] - box_b[1])
-        union = area_a + area_b - inter
-        return inter / (union + 1e-6)
+    def _iou_matrix(boxes_a: np.ndarray, boxes_b: np.ndarray) -> np.ndarray:
+        """Pairwise IoU between [N,4] and [M,4] boxes via broadcasting."""
+        x1 = np.maximum(boxes_a[:, None, 0], boxes_b[None, :, 0])
+        y1 = np.maximum(boxes_a[:, None, 1], boxes_b[None, :, 1])
+        x2 = np.minimum(boxes_a[:, None, 2], boxes_b[None, :, 2])
+        y2 = np.minimum(boxes_a[:, None, 3], boxes_b[None, :, 3])
+        inter = np.clip(x2 - x1, 0, None) * np.clip(y2 - y1, 0, None)
+        area_a = (boxes_a[:, 2] - boxes_a[:, 0]) * (boxes_a[:, 3] - boxes_a[:, 1])
+        area_b = (boxes_b[:, 2] - boxes_b[:, 0]) * (boxes_b[:, 3] - boxes_b[:, 1])
+        return inter / (area_a[:, None] + area_b[None, :] - inter + 1e-6)